@@ -1,23 +1,23 @@
 
 
 
-import openai  
-from langchain_openai import AzureChatOpenAI  # Import AzureChatOpenAI from LangChain for Azure OpenAI
-from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler 
-from langchain_core.messages import HumanMessage 
+from LLM_Manager import load_endpoint_configs  # Shared env/JSON endpoint configuration
 
 class LLM_Mgr:
     def __init__(self):
-        api_key = "3ff3542f1ca04ea2bb7ec8068cd914b4"  # Azure OpenAI API key
-        azure_endpoint = "https://karajan-gpt4.openai.azure.com/"  # Azure OpenAI endpoint
-        api_version = "2023-05-15"  # Azure OpenAI API version
-        deployment = "karajan-gpt4"  # Azure OpenAI deployment name
-        openai.api_key = api_key  # Set OpenAI API key globally for openai library
+        # LangChain imports live here rather than at module top: pulling in
+        # langchain/pydantic costs hundreds of ms, which scripts that merely
+        # import this module (or fail argument checks) should not pay.
+        from langchain_openai import AzureChatOpenAI  # Import AzureChatOpenAI from LangChain for Azure OpenAI
+        from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
+        # Credentials come from the environment/.env via the shared loader;
+        # no API key is kept in the source tree.
+        config = load_endpoint_configs()[0]
         self.llm = AzureChatOpenAI(  # Initialize AzureChatOpenAI client
-            azure_endpoint=azure_endpoint,
-            openai_api_key=api_key,
-            openai_api_version=api_version,
-            deployment_name=deployment,
+            azure_endpoint=config["endpoint"],
+            openai_api_key=config["key"],
+            openai_api_version=config["api_version"],
+            deployment_name=config["deployment"],
             temperature=0.7,  # LLM temperature for response randomness
             streaming=True,  # Enable streaming output
             callbacks=[StreamingStdOutCallbackHandler()],  
@@ -127,6 +127,7 @@ class LLM_Mgr:
         return True  # Indicate that improvement was successfully applied
 
     def improve_sfc(self, prompt):
+        from langchain_core.messages import HumanMessage
         response = self.llm.invoke([HumanMessage(content=prompt)])  # Send the prompt to the LLM and get response
         return response.content  # Return LLM response as string
 
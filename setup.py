@@ -10,12 +10,17 @@ import os
 import sys
 import subprocess
 import platform
+from concurrent.futures import ThreadPoolExecutor
 
-def run_command(command, description):
-    """Run a command and handle errors"""
+def run_command(command, description, capture=True):
+    """Run a command and handle errors
+
+    capture=False streams the command's own output instead of buffering it,
+    which avoids holding multi-MB logs (e.g. a long pip install) in memory.
+    """
     print(f"Running: {description}")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        result = subprocess.run(command, shell=True, check=True, capture_output=capture, text=True)
         print(f"✓ {description} completed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -39,9 +44,22 @@ def check_python_version():
 def install_dependencies():
     """Install Python dependencies"""
     print("\nInstalling Python dependencies...")
+    # Wheels-only first: skipping any sdist compile path makes the install
+    # dramatically faster for the langchain/openai stack when wheels exist.
+    if run_command(
+        f"{sys.executable} -m pip install --prefer-binary --only-binary=:all: "
+        f"--disable-pip-version-check -r requirements.txt",
+        "Installing Python packages (wheels only)",
+        capture=False
+    ):
+        return True
+    # Some platform/package combination has no wheel; fall back to allowing
+    # source builds rather than failing setup.
     return run_command(
-        f"{sys.executable} -m pip install -r requirements.txt",
-        "Installing Python packages"
+        f"{sys.executable} -m pip install --prefer-binary "
+        f"--disable-pip-version-check -r requirements.txt",
+        "Installing Python packages",
+        capture=False
     )
 
 def install_graphviz():
@@ -99,22 +117,29 @@ def main():
     print("=== Containment Checker Setup ===\n")
     
     success = True
-    
+
     # Check Python version
     if not check_python_version():
         success = False
-    
-    # Install Python dependencies
-    if success and not install_dependencies():
-        success = False
-    
-    # Install Graphviz
-    if success and not install_graphviz():
-        print("⚠ Graphviz installation failed, but you can install it manually")
-    
-    # Create .env file
-    if success and not create_env_file():
-        success = False
+
+    if success:
+        # pip install, Graphviz install and .env creation are independent
+        # (network- and I/O-bound), so run them concurrently instead of
+        # serially — setup time drops to the slowest of the three.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            deps_future = executor.submit(install_dependencies)
+            graphviz_future = executor.submit(install_graphviz)
+            env_future = executor.submit(create_env_file)
+            deps_ok = deps_future.result()
+            graphviz_ok = graphviz_future.result()
+            env_ok = env_future.result()
+
+        if not deps_ok:
+            success = False
+        if not graphviz_ok:
+            print("⚠ Graphviz installation failed, but you can install it manually")
+        if not env_ok:
+            success = False
     
     print("\n=== Setup Summary ===")
     if success: